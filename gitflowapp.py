@@ -10,12 +10,34 @@ Usage:
     python gitflowapp.py pr -t "New feature"         # Create pull request
 """
 
-import requests
 import json
 import sys
 import subprocess
 import os
+import shlex
+import re
+import hashlib
+import time
 import argparse
+import configparser
+import functools
+
+try:
+    import orjson  # Optional, faster JSON decoding of API responses
+except ImportError:
+    orjson = None
+
+
+API_URL = 'https://api.github.com'
+API_HEADERS = {'Accept': 'application/vnd.github.v3+json'}
+
+# Shared HTTP session, created on first API call so that commands that never
+# touch the network don't pay for importing requests
+_session = None
+
+# Usernames looked up via GET /user are cached per token for a day
+USER_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'gitflowai', 'user.json')
+USER_CACHE_TTL = 24 * 60 * 60
 
 
 def load_config(path='github_config.json'):
@@ -27,6 +49,47 @@ def load_config(path='github_config.json'):
         return {}
 
 
+class LazyConfig:
+    """Config that is only loaded from disk the first time a value is looked up."""
+    
+    def __init__(self, path='github_config.json'):
+        self.path = path
+        self._data = None
+    
+    def get(self, key, default=None):
+        if self._data is None:
+            self._data = load_config(self.path)
+        return self._data.get(key, default)
+
+
+class Progress:
+    """Buffers human-readable progress lines and writes them out in batches.
+    
+    In quiet (--json) mode progress lines are dropped; errors always print.
+    """
+    
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+        self.lines = []
+    
+    def say(self, line):
+        if not self.quiet:
+            self.lines.append(line)
+    
+    def error(self, line):
+        self.flush()
+        print(line)
+    
+    def flush(self):
+        if self.lines:
+            sys.stdout.write('\n'.join(self.lines) + '\n')
+            sys.stdout.flush()
+            self.lines = []
+
+
+progress = Progress()
+
+
 def get_token(config):
     """Get GitHub token from env or config."""
     token = os.environ.get('GITHUB_TOKEN') or config.get('github_token')
@@ -36,113 +99,332 @@ def get_token(config):
     return token
 
 
+def get_session(token):
+    """Get the shared GitHub API session, creating it on first use."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        _session = requests.Session()
+        _session.mount('https://', HTTPAdapter(
+            pool_connections=4, pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                              raise_on_status=False)
+        ))
+        _session.headers.update({'Authorization': f'token {token}', **API_HEADERS})
+    return _session
+
+
+def parse_json(response):
+    """Decode a JSON API response body."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def get_username(token):
+    """Get the GitHub login for the token, using the on-disk cache when fresh."""
+    key = hashlib.sha256(token.encode()).hexdigest()[:16]
+    try:
+        with open(USER_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+    
+    entry = cache.get(key)
+    if isinstance(entry, dict):
+        login, ts = entry.get('login'), entry.get('ts')
+        if isinstance(login, str) and login and isinstance(ts, (int, float)) and time.time() - ts < USER_CACHE_TTL:
+            return login
+    
+    response = get_session(token).get(f'{API_URL}/user')
+    if response.status_code != 200:
+        return None
+    
+    login = parse_json(response)['login']
+    cache[key] = {'login': login, 'ts': time.time()}
+    try:
+        os.makedirs(os.path.dirname(USER_CACHE_PATH), exist_ok=True)
+        with open(USER_CACHE_PATH, 'w') as f:
+            json.dump(cache, f)
+    except OSError:
+        pass  # Caching is best effort
+    return login
+
+
+def fail(action, error, args, message=None, **extra):
+    """Report a failed command and exit.
+    
+    Prints the failure result as JSON in --json mode, otherwise the
+    human-readable message (if any).
+    """
+    if args.json:
+        result = {'action': action, 'status': 'failed', 'error': error, **extra}
+        progress.error(json.dumps(result, indent=2))
+    elif message:
+        progress.error(f"Error: {message}")
+    sys.exit(1)
+
+
 def run_git(command, cwd=None, capture=True):
-    """Run a git command and return success status."""
+    """Run a git command and return success status.
+    
+    With capture=False output is discarded instead of piped back, for calls
+    where only the exit code matters.
+    """
     try:
-        result = subprocess.run(command, cwd=cwd, check=True, capture_output=capture, text=True)
-        return result if capture else True
+        if not capture:
+            subprocess.run(command, cwd=cwd, check=True,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return True
+        return subprocess.run(command, cwd=cwd, check=True, capture_output=True, text=True)
     except subprocess.CalledProcessError as e:
         if capture:
-            print(f"Git error: {e.stderr}")
+            progress.error(f"Git error: {e.stderr}")
         return False
 
 
+def shell_join(command):
+    """Quote a git command for a POSIX shell."""
+    return ' '.join(shlex.quote(arg) for arg in command)
+
+
+def chain_command(steps):
+    """Join steps into one POSIX shell command line (see run_git_chain)."""
+    parts = []
+    for alternatives in steps:
+        joined = ' || '.join(shell_join(command) for command in alternatives)
+        parts.append(f'({joined})' if len(alternatives) > 1 else joined)
+    return ' && '.join(parts)
+
+
+def run_git_chain(steps, cwd=None):
+    """Run steps in order, stopping at the first failure; return success status.
+    
+    Each step is a list of alternative commands, tried in turn until one
+    succeeds. On POSIX the whole chain runs in a single shell process. cmd.exe
+    has no reliable quoting for arbitrary arguments (&, |, ^, %), so on Windows
+    each command runs on its own without a shell.
+    """
+    if os.name != 'nt':
+        result = subprocess.run(chain_command(steps), cwd=cwd, shell=True,
+                              capture_output=True, text=True)
+        if result.returncode != 0:
+            progress.error(f"Git error: {result.stderr}")
+            return False
+        return True
+    
+    for alternatives in steps:
+        for command in alternatives:
+            result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+            if result.returncode == 0:
+                break
+        else:
+            progress.error(f"Git error: {result.stderr}")
+            return False
+    return True
+
+
+def staging_steps(local_path):
+    """Steps that init (if needed) and stage everything in local_path."""
+    steps = []
+    if not os.path.exists(os.path.join(local_path, '.git')):
+        steps.append([['git', 'init']])
+    steps.append([['git', 'add', '.']])
+    return steps
+
+
+def start_staging(local_path):
+    """Start init and add in the background."""
+    if os.name != 'nt':
+        return subprocess.Popen(chain_command(staging_steps(local_path)), cwd=local_path, shell=True,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    # No shell on Windows (see run_git_chain): init up front, add in the background
+    if not os.path.exists(os.path.join(local_path, '.git')):
+        subprocess.run(['git', 'init'], cwd=local_path, capture_output=True)
+    return subprocess.Popen(['git', 'add', '.'], cwd=local_path,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+
+# Above this many changed paths a plain 'git add .' beats passing them on the command line
+ADD_PATHS_LIMIT = 200
+
+
+def list_changed_paths(local_path=None):
+    """List modified, deleted and untracked paths with a single ls-files call.
+    
+    Returns None if git fails.
+    """
+    result = subprocess.run(['git', 'ls-files', '-z', '--modified', '--deleted',
+                             '--others', '--exclude-standard'],
+                          cwd=local_path, capture_output=True)
+    if result.returncode != 0:
+        return None
+    # Deleted files are reported by both --modified and --deleted
+    return list(dict.fromkeys(os.fsdecode(path) for path in result.stdout.split(b'\0') if path))
+
+
+def has_staged_changes(local_path=None):
+    """Check whether the index differs from HEAD."""
+    return not run_git(['git', 'diff', '--cached', '--quiet'], local_path, capture=False)
+
+
+# Inline config for git push: compress packs on all cores, regardless of what
+# the user's git config pins pack.threads to
+PUSH_CONFIG = ['-c', 'pack.threads=0']
+
+# GitHub remote URLs: https://[token@]github.com/owner/repo[.git], git://github.com/owner/repo[.git],
+# ssh://git@github.com[:port]/owner/repo[.git] or git@github.com:owner/repo[.git],
+# including SSH host aliases such as git@github.com-work:owner/repo.git
+GITHUB_URL_RE = re.compile(r'(?:(?:https?|git)://(?:[^@/]+@)?|ssh://git@(?=[^/]*/)|git@)'
+                           r'github\.com(?:-[^:/]+)?(?::\d+(?=/))?[:/]([^/]+)/([^/]+?)(?:\.git)?/?$')
+
+# Git metadata cached per repository path for the lifetime of one command
+_git_state = {}
+
+
+@functools.lru_cache(maxsize=8)
+def is_git_repo(path):
+    """Check whether path has a .git entry (cached for the command's lifetime)."""
+    try:
+        os.stat(os.path.join(path, '.git'))
+    except OSError:
+        return False
+    return True
+
+
+GLOBAL_GIT_CONFIGS = [
+    os.path.join(os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config'), 'git', 'config'),
+    os.path.expanduser('~/.gitconfig'),
+]
+
+
+def read_git_files(local_path=None):
+    """Read current branch and origin URL from .git/HEAD and .git/config.
+    
+    Returns None when the files can't be read or parsed (e.g. worktrees or
+    subdirectories, where .git is not a directory next to local_path), or when
+    the origin URL depends on git's own config handling: includes, url rewrites
+    (insteadOf), or values with comments, quotes or escapes.
+    """
+    git_dir = os.path.join(local_path or '.', '.git')
+    config = configparser.ConfigParser(strict=False, allow_no_value=True, interpolation=None)
+    try:
+        with open(os.path.join(git_dir, 'HEAD')) as f:
+            head = f.read().strip()
+        # url rewrites and includes in the user's global config apply here too
+        config.read(GLOBAL_GIT_CONFIGS, encoding='utf-8')
+        with open(os.path.join(git_dir, 'config')) as f:
+            config.read_file(f)
+    except (OSError, UnicodeDecodeError, configparser.Error):
+        return None
+    
+    if any(section.partition('"')[0].strip().lower() in ('include', 'includeif', 'url')
+           for section in config.sections()):
+        return None
+    origin_url = config.get('remote "origin"', 'url', fallback=None)
+    if not origin_url or any(c in origin_url for c in '#;"\\'):
+        return None
+    
+    branch = None
+    if head.startswith('ref: refs/heads/'):
+        branch = head[len('ref: refs/heads/'):]
+    return {'branch': branch, 'origin_url': origin_url.strip()}
+
+
+def query_git_state(local_path=None):
+    """Ask git for current branch and origin URL."""
+    head = subprocess.run(['git', 'symbolic-ref', '-q', '--short', 'HEAD'],
+                        cwd=local_path, capture_output=True, text=True)
+    branch = head.stdout.strip() if head.returncode == 0 else None
+    
+    origin = subprocess.run(['git', 'remote', 'get-url', 'origin'],
+                          cwd=local_path, capture_output=True, text=True)
+    return {
+        'branch': branch,
+        'origin_url': origin.stdout.strip() if origin.returncode == 0 else None
+    }
+
+
+def load_git_state(local_path=None):
+    """Read current branch and origin URL once and cache them."""
+    key = os.path.abspath(local_path or '.')
+    if key not in _git_state:
+        _git_state[key] = read_git_files(local_path) or query_git_state(local_path)
+    return _git_state[key]
+
+
 def get_current_branch(local_path=None):
     """Get the current git branch."""
-    result = subprocess.run(['git', 'branch', '--show-current'], 
-                          cwd=local_path, capture_output=True, text=True)
-    if result.returncode == 0:
-        return result.stdout.strip()
-    return None
+    return load_git_state(local_path)['branch']
 
 
 def get_repo_info(local_path=None):
     """Get repository name and owner from git remote."""
-    result = subprocess.run(['git', 'remote', 'get-url', 'origin'], 
-                          cwd=local_path, capture_output=True, text=True)
-    if result.returncode != 0:
-        return None, None
-    
-    # Parse URL like https://github.com/owner/repo.git or git@github.com:owner/repo.git
-    url = result.stdout.strip()
-    if 'github.com' in url:
-        parts = url.replace('.git', '').replace(':', '/').split('/')
-        if len(parts) >= 2:
-            return parts[-2], parts[-1]  # owner, repo
+    url = load_git_state(local_path)['origin_url']
+    match = GITHUB_URL_RE.match(url) if url else None
+    if match:
+        return match.group(1), match.group(2)  # owner, repo
     return None, None
 
 
 def create_repo(token, name, description='', private=False, auto_init=True):
     """Create a GitHub repository."""
-    response = requests.post(
-        'https://api.github.com/user/repos',
-        headers={'Authorization': f'token {token}', 'Accept': 'application/vnd.github.v3+json'},
+    response = get_session(token).post(
+        f'{API_URL}/user/repos',
         json={'name': name, 'description': description, 'private': private, 'auto_init': auto_init}
     )
     
     if response.status_code == 201:
-        return response.json()
+        return parse_json(response)
     elif response.status_code == 422:
-        print("Error: Repository already exists or name is invalid")
+        progress.error("Error: Repository already exists or name is invalid")
     elif response.status_code == 401:
-        print("Error: Authentication failed. Check your token.")
+        progress.error("Error: Authentication failed. Check your token.")
     else:
-        print(f"Error: Failed to create repository (HTTP {response.status_code})")
+        progress.error(f"Error: Failed to create repository (HTTP {response.status_code})")
     sys.exit(1)
 
 
-def push_code(local_path, repo_url, branch='main', quiet=False):
-    """Initialize git repo and push to GitHub."""
+def push_code(local_path, repo_url, branch='main', staging=None):
+    """Initialize git repo and push to GitHub.
+    
+    If staging is a process returned by start_staging, init and add are
+    assumed to be running there and are waited on instead of repeated.
+    """
     if not os.path.exists(local_path):
-        if not quiet:
-            print(f"Error: Path '{local_path}' does not exist")
+        progress.error(f"Error: Path '{local_path}' does not exist")
         return False
     
-    if not quiet:
-        print(f"\nInitializing git in: {local_path}")
-    
-    # Init repo if needed
-    if not os.path.exists(os.path.join(local_path, '.git')):
-        if not run_git(['git', 'init'], local_path):
-            return False
-        if not quiet:
-            print("✓ Git initialized")
-    
-    # Stage and commit
-    if not quiet:
-        print("Adding files...")
-    if not run_git(['git', 'add', '.'], local_path):
-        return False
+    progress.say(f"\nInitializing git in: {local_path}")
     
-    # Check if there's anything to commit
-    result = subprocess.run(['git', 'status', '--porcelain'], cwd=local_path, 
-                          capture_output=True, text=True)
-    if result.stdout.strip():
-        if not quiet:
-            print("Committing...")
-        if not run_git(['git', 'commit', '-m', 'Initial commit'], local_path):
+    # Init, stage, commit, set remote and push (one shell invocation on POSIX)
+    if staging is None:
+        steps = staging_steps(local_path)
+    else:
+        _, stderr = staging.communicate()
+        if staging.returncode != 0:
+            progress.error(f"Git error: {stderr}")
             return False
-    
-    # Rename branch if needed
-    result = subprocess.run(['git', 'branch', '--show-current'], cwd=local_path,
-                          capture_output=True, text=True)
-    if result.returncode == 0 and result.stdout.strip() and result.stdout.strip() != branch:
-        run_git(['git', 'branch', '-M', branch], local_path)
-    
-    # Add/update remote
-    subprocess.run(['git', 'remote', 'remove', 'origin'], cwd=local_path, 
-                  stderr=subprocess.DEVNULL)
-    if not run_git(['git', 'remote', 'add', 'origin', repo_url], local_path):
-        return False
-    
-    # Push
-    if not quiet:
-        print(f"Pushing to GitHub...")
-    if not run_git(['git', 'push', '-u', 'origin', branch], local_path):
+        steps = []
+    steps += [
+        # A failed commit is fine as long as nothing was staged
+        [['git', 'commit', '-m', 'Initial commit'], ['git', 'diff', '--cached', '--quiet']],
+        [['git', 'branch', '-M', branch]],
+        [['git', 'remote', 'set-url', 'origin', repo_url], ['git', 'remote', 'add', 'origin', repo_url]],
+        [['git'] + PUSH_CONFIG + ['push', '-u', 'origin', branch]],
+    ]
+    
+    progress.say("Adding files, committing and pushing to GitHub...")
+    progress.flush()
+    if not run_git_chain(steps, local_path):
         return False
     
-    if not quiet:
-        print("✓ Code pushed successfully!")
+    progress.say("✓ Code pushed successfully!")
     return True
 
 
@@ -150,17 +432,31 @@ def cmd_create(args, config, token):
     """Handle 'create' command."""
     repo_name = args.name or config.get('repo_name')
     if not repo_name:
-        print("Error: Repository name required (use --name or set in config)")
+        progress.error("Error: Repository name required (use --name or set in config)")
         sys.exit(1)
     
     description = args.description or config.get('description', '')
     private = args.private or config.get('private', False)
     should_push = not args.no_push and config.get('push_code', True)
+    local_path = args.path or config.get('local_path') or os.getcwd()
+    branch = args.branch or config.get('branch', 'main')
+    
+    # Init and stage locally while the repository is being created; the commit
+    # waits until creation succeeds
+    staging = None
+    if should_push and os.path.isdir(local_path):
+        staging = start_staging(local_path)
     
     # Create repo
-    if not args.json:
-        print(f"Creating repository: {repo_name}")
-    repo_data = create_repo(token, repo_name, description, private, auto_init=not should_push)
+    progress.say(f"Creating repository: {repo_name}")
+    progress.flush()
+    try:
+        repo_data = create_repo(token, repo_name, description, private, auto_init=not should_push)
+    except BaseException:
+        # API errors, dropped connections or Ctrl+C: reap the background git first
+        if staging:
+            staging.communicate()
+        raise
     
     result = {
         'action': 'create',
@@ -170,27 +466,24 @@ def cmd_create(args, config, token):
         'private': private
     }
     
-    if not args.json:
-        print(f"✓ Repository created: {repo_data['html_url']}")
+    progress.say(f"✓ Repository created: {repo_data['html_url']}")
     
     # Push code if requested
     if should_push:
-        local_path = args.path or config.get('local_path') or os.getcwd()
-        branch = args.branch or config.get('branch', 'main')
         auth_url = repo_data['clone_url'].replace('https://', f'https://{token}@')
         
         result['push'] = True
         result['branch'] = branch
         result['local_path'] = local_path
         
-        if push_code(local_path, auth_url, branch, quiet=args.json):
+        if push_code(local_path, auth_url, branch, staging=staging):
             result['push_status'] = 'success'
         else:
             result['push_status'] = 'failed'
             if args.json:
-                print(json.dumps(result, indent=2))
+                progress.error(json.dumps(result, indent=2))
             else:
-                print("\n⚠ Repository created but push failed")
+                progress.error("\n⚠ Repository created but push failed")
             sys.exit(1)
     
     return result
@@ -200,20 +493,28 @@ def cmd_push(args, config, token):
     """Handle 'push' command."""
     repo_name = args.name or config.get('repo_name')
     if not repo_name:
-        print("Error: Repository name required (use --name or set in config)")
+        progress.error("Error: Repository name required (use --name or set in config)")
         sys.exit(1)
     
-    # Get username
-    response = requests.get('https://api.github.com/user',
-                          headers={'Authorization': f'token {token}'})
-    if response.status_code != 200:
-        print("Error: Failed to get user info")
-        sys.exit(1)
-    
-    username = response.json()['login']
     local_path = args.path or config.get('local_path') or os.getcwd()
     branch = args.branch or config.get('branch', 'main')
     
+    # Stage files locally while the username is fetched
+    staging = start_staging(local_path) if os.path.isdir(local_path) else None
+    
+    # Get username
+    try:
+        username = get_username(token)
+    except BaseException:
+        if staging:
+            staging.communicate()
+        raise
+    if not username:
+        if staging:
+            staging.communicate()
+        progress.error("Error: Failed to get user info")
+        sys.exit(1)
+    
     repo_url = f"https://{token}@github.com/{username}/{repo_name}.git"
     
     result = {
@@ -224,14 +525,13 @@ def cmd_push(args, config, token):
         'url': f"https://github.com/{username}/{repo_name}"
     }
     
-    if push_code(local_path, repo_url, branch, quiet=args.json):
+    if push_code(local_path, repo_url, branch, staging=staging):
         result['status'] = 'success'
-        if not args.json:
-            print(f"\n✓ View at: https://github.com/{username}/{repo_name}")
+        progress.say(f"\n✓ View at: https://github.com/{username}/{repo_name}")
     else:
         result['status'] = 'failed'
         if args.json:
-            print(json.dumps(result, indent=2))
+            progress.error(json.dumps(result, indent=2))
         sys.exit(1)
     
     return result
@@ -241,58 +541,45 @@ def cmd_commit(args, config, token):
     """Handle 'commit' command - commit and push changes."""
     local_path = args.path or config.get('local_path') or os.getcwd()
     message = args.message or config.get('commit_message', 'Update')
-    branch = args.branch or get_current_branch(local_path) or 'main'
     
-    if not os.path.exists(os.path.join(local_path, '.git')):
-        if not args.json:
-            print("Error: Not a git repository. Run 'create' or 'push' first.")
-        result = {'action': 'commit', 'status': 'failed', 'error': 'not_a_git_repo'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+    if not is_git_repo(local_path):
+        fail('commit', 'not_a_git_repo', args, "Not a git repository. Run 'create' or 'push' first.")
     
+    branch = args.branch or get_current_branch(local_path) or 'main'
     owner, repo_name = get_repo_info(local_path)
     
-    if not args.json:
-        print(f"Committing changes in: {local_path}")
-        print(f"Branch: {branch}")
-    
-    # Stage all changes
-    if not run_git(['git', 'add', '.'], local_path):
-        result = {'action': 'commit', 'status': 'failed', 'error': 'git_add_failed'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+    progress.say(f"Committing changes in: {local_path}")
+    progress.say(f"Branch: {branch}")
     
-    # Check if there are changes to commit
-    status_result = subprocess.run(['git', 'status', '--porcelain'], 
+    # Stage all changes, naming the changed paths when there are only a few
+    paths = list_changed_paths(local_path)
+    if paths is None or len(paths) >= ADD_PATHS_LIMIT:
+        add_command = ['git', 'add', '.']
+    else:
+        # The list is already filtered by --exclude-standard; -f keeps git from
+        # rejecting tracked files that sit under an ignored directory
+        add_command = ['git', '--literal-pathspecs', 'add', '-f', '--'] + paths
+    if paths != [] and not run_git(add_command, local_path):
+        fail('commit', 'git_add_failed', args)
+    
+    # Commit, letting git decide whether there is anything to commit
+    progress.say(f"Committing with message: '{message}'")
+    commit_result = subprocess.run(['git', 'commit', '-m', message],
                                   cwd=local_path, capture_output=True, text=True)
     
-    if not status_result.stdout.strip():
-        if not args.json:
-            print("✓ No changes to commit")
-        result = {'action': 'commit', 'status': 'no_changes', 'branch': branch}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        return result
+    if commit_result.returncode != 0 and not has_staged_changes(local_path):
+        progress.say("✓ No changes to commit")
+        return {'action': 'commit', 'status': 'no_changes', 'branch': branch}
     
-    # Commit
-    if not args.json:
-        print(f"Committing with message: '{message}'")
-    if not run_git(['git', 'commit', '-m', message], local_path):
-        result = {'action': 'commit', 'status': 'failed', 'error': 'git_commit_failed'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+    if commit_result.returncode != 0:
+        progress.error(f"Git error: {commit_result.stderr or commit_result.stdout}")
+        fail('commit', 'git_commit_failed', args)
     
     # Push
-    if not args.json:
-        print("Pushing to GitHub...")
-    if not run_git(['git', 'push', 'origin', branch], local_path):
-        result = {'action': 'commit', 'status': 'failed', 'error': 'git_push_failed'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+    progress.say("Pushing to GitHub...")
+    progress.flush()
+    if not run_git(['git'] + PUSH_CONFIG + ['push', 'origin', branch], local_path):
+        fail('commit', 'git_push_failed', args)
     
     result = {
         'action': 'commit',
@@ -306,10 +593,9 @@ def cmd_commit(args, config, token):
         result['repository'] = repo_name
         result['url'] = f"https://github.com/{owner}/{repo_name}"
     
-    if not args.json:
-        print("✓ Changes committed and pushed!")
-        if owner and repo_name:
-            print(f"✓ View at: https://github.com/{owner}/{repo_name}")
+    progress.say("✓ Changes committed and pushed!")
+    if owner and repo_name:
+        progress.say(f"✓ View at: https://github.com/{owner}/{repo_name}")
     
     return result
 
@@ -320,50 +606,31 @@ def cmd_branch(args, config, token):
     branch_name = args.name
     
     if not branch_name:
-        if not args.json:
-            print("Error: Branch name required (use --name or -n)")
-        result = {'action': 'branch', 'status': 'failed', 'error': 'branch_name_required'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+        fail('branch', 'branch_name_required', args, "Branch name required (use --name or -n)")
     
-    if not os.path.exists(os.path.join(local_path, '.git')):
-        if not args.json:
-            print("Error: Not a git repository. Run 'create' or 'push' first.")
-        result = {'action': 'branch', 'status': 'failed', 'error': 'not_a_git_repo'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+    if not is_git_repo(local_path):
+        fail('branch', 'not_a_git_repo', args, "Not a git repository. Run 'create' or 'push' first.")
     
     owner, repo_name = get_repo_info(local_path)
     current_branch = get_current_branch(local_path)
     
-    if not args.json:
-        print(f"Creating branch: {branch_name}")
-        print(f"From: {current_branch}")
+    progress.say(f"Creating branch: {branch_name}")
+    progress.say(f"From: {current_branch}")
     
     # Create branch
-    if not run_git(['git', 'checkout', '-b', branch_name], local_path):
+    if not run_git(['git', 'checkout', '-b', branch_name], local_path, capture=False):
         # Branch might already exist, try to switch to it
         if not run_git(['git', 'checkout', branch_name], local_path):
-            result = {'action': 'branch', 'status': 'failed', 'error': 'git_checkout_failed'}
-            if args.json:
-                print(json.dumps(result, indent=2))
-            sys.exit(1)
-        if not args.json:
-            print(f"✓ Switched to existing branch: {branch_name}")
+            fail('branch', 'git_checkout_failed', args)
+        progress.say(f"✓ Switched to existing branch: {branch_name}")
     else:
-        if not args.json:
-            print(f"✓ Branch created: {branch_name}")
+        progress.say(f"✓ Branch created: {branch_name}")
     
     # Push branch to remote
-    if not args.json:
-        print("Pushing branch to GitHub...")
-    if not run_git(['git', 'push', '-u', 'origin', branch_name], local_path):
-        result = {'action': 'branch', 'status': 'failed', 'error': 'git_push_failed'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+    progress.say("Pushing branch to GitHub...")
+    progress.flush()
+    if not run_git(['git'] + PUSH_CONFIG + ['push', '-u', 'origin', branch_name], local_path):
+        fail('branch', 'git_push_failed', args)
     
     result = {
         'action': 'branch',
@@ -377,10 +644,9 @@ def cmd_branch(args, config, token):
         result['repository'] = repo_name
         result['url'] = f"https://github.com/{owner}/{repo_name}/tree/{branch_name}"
     
-    if not args.json:
-        print(f"✓ Branch pushed to GitHub!")
-        if owner and repo_name:
-            print(f"✓ View at: https://github.com/{owner}/{repo_name}/tree/{branch_name}")
+    progress.say(f"✓ Branch pushed to GitHub!")
+    if owner and repo_name:
+        progress.say(f"✓ View at: https://github.com/{owner}/{repo_name}/tree/{branch_name}")
     
     return result
 
@@ -392,48 +658,30 @@ def cmd_pr(args, config, token):
     body = args.body or ''
     base = args.base or 'main'
     
-    if not os.path.exists(os.path.join(local_path, '.git')):
-        if not args.json:
-            print("Error: Not a git repository. Run 'create' or 'push' first.")
-        result = {'action': 'pr', 'status': 'failed', 'error': 'not_a_git_repo'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+    if not is_git_repo(local_path):
+        fail('pr', 'not_a_git_repo', args, "Not a git repository. Run 'create' or 'push' first.")
     
     owner, repo_name = get_repo_info(local_path)
-    current_branch = get_current_branch(local_path)
     
     if not owner or not repo_name:
-        if not args.json:
-            print("Error: Could not determine repository info from git remote")
-        result = {'action': 'pr', 'status': 'failed', 'error': 'no_remote_info'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+        fail('pr', 'no_remote_info', args, "Could not determine repository info from git remote")
+    
+    current_branch = get_current_branch(local_path)
     
     if not current_branch or current_branch == base:
-        if not args.json:
-            print(f"Error: Cannot create PR from {base} branch. Switch to a feature branch first.")
-        result = {'action': 'pr', 'status': 'failed', 'error': 'invalid_branch'}
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+        fail('pr', 'invalid_branch', args, f"Cannot create PR from {base} branch. Switch to a feature branch first.")
     
     # Use branch name as title if not provided
     if not title:
         title = current_branch.replace('-', ' ').replace('_', ' ').title()
     
-    if not args.json:
-        print(f"Creating pull request: {title}")
-        print(f"From: {current_branch} → To: {base}")
+    progress.say(f"Creating pull request: {title}")
+    progress.say(f"From: {current_branch} → To: {base}")
+    progress.flush()
     
     # Create PR via GitHub API
-    response = requests.post(
-        f'https://api.github.com/repos/{owner}/{repo_name}/pulls',
-        headers={
-            'Authorization': f'token {token}',
-            'Accept': 'application/vnd.github.v3+json'
-        },
+    response = get_session(token).post(
+        f'{API_URL}/repos/{owner}/{repo_name}/pulls',
         json={
             'title': title,
             'body': body,
@@ -443,7 +691,7 @@ def cmd_pr(args, config, token):
     )
     
     if response.status_code == 201:
-        pr_data = response.json()
+        pr_data = parse_json(response)
         result = {
             'action': 'pr',
             'status': 'success',
@@ -455,32 +703,23 @@ def cmd_pr(args, config, token):
             'repository': repo_name
         }
         
-        if not args.json:
-            print(f"✓ Pull request created: #{pr_data['number']}")
-            print(f"✓ View at: {pr_data['html_url']}")
+        progress.say(f"✓ Pull request created: #{pr_data['number']}")
+        progress.say(f"✓ View at: {pr_data['html_url']}")
         
         return result
     else:
-        error_msg = response.json().get('message', 'Unknown error')
-        if not args.json:
-            print(f"Error: Failed to create PR - {error_msg}")
-        result = {
-            'action': 'pr',
-            'status': 'failed',
-            'error': error_msg,
-            'http_status': response.status_code
-        }
-        if args.json:
-            print(json.dumps(result, indent=2))
-        sys.exit(1)
+        error_data = parse_json(response)
+        # GitHub rejects an unknown base branch with a 422 validation error on 'base'
+        if response.status_code == 422 and any(
+                isinstance(e, dict) and e.get('field') == 'base' for e in error_data.get('errors', [])):
+            fail('pr', 'base_branch_not_found', args, f"Base branch '{base}' not found on GitHub",
+                 http_status=response.status_code)
+        error_msg = error_data.get('message', 'Unknown error')
+        fail('pr', error_msg, args, f"Failed to create PR - {error_msg}",
+             http_status=response.status_code)
 
 
-def main():
-    parser = argparse.ArgumentParser(description='GitFlowAI - GitHub workflow automation tool')
-    parser.add_argument('--json', action='store_true', help='Output result as JSON')
-    subparsers = parser.add_subparsers(dest='command', required=True)
-    
-    # Create command
+def add_create_parser(subparsers):
     create = subparsers.add_parser('create', help='Create a new repository')
     create.add_argument('--name', '-n', help='Repository name')
     create.add_argument('--description', '-d', help='Repository description')
@@ -488,51 +727,79 @@ def main():
     create.add_argument('--no-push', action='store_true', help='Do not push code')
     create.add_argument('--path', help='Local code path (default: current dir)')
     create.add_argument('--branch', '-b', help='Branch name (default: main)')
-    
-    # Push command
+
+
+def add_push_parser(subparsers):
     push = subparsers.add_parser('push', help='Push code to existing repository')
     push.add_argument('--name', '-n', help='Repository name')
     push.add_argument('--path', help='Local code path (default: current dir)')
     push.add_argument('--branch', '-b', help='Branch name (default: main)')
-    
-    # Commit command
+
+
+def add_commit_parser(subparsers):
     commit = subparsers.add_parser('commit', help='Commit and push changes')
     commit.add_argument('--message', '-m', required=True, help='Commit message')
     commit.add_argument('--path', help='Local code path (default: current dir)')
     commit.add_argument('--branch', '-b', help='Branch to push to (default: current branch)')
-    
-    # Branch command
+
+
+def add_branch_parser(subparsers):
     branch = subparsers.add_parser('branch', help='Create and push a new branch')
     branch.add_argument('--name', '-n', required=True, help='Branch name')
     branch.add_argument('--path', help='Local code path (default: current dir)')
-    
-    # PR command
+
+
+def add_pr_parser(subparsers):
     pr = subparsers.add_parser('pr', help='Create a pull request')
     pr.add_argument('--title', '-t', help='PR title (default: branch name)')
     pr.add_argument('--body', '-b', help='PR description/body')
     pr.add_argument('--base', help='Base branch (default: main)')
     pr.add_argument('--path', help='Local code path (default: current dir)')
+
+
+# Command name -> (handler, subparser builder)
+COMMANDS = {
+    'create': (cmd_create, add_create_parser),
+    'push': (cmd_push, add_push_parser),
+    'commit': (cmd_commit, add_commit_parser),
+    'branch': (cmd_branch, add_branch_parser),
+    'pr': (cmd_pr, add_pr_parser),
+}
+
+
+def find_command(argv):
+    """Return the command named in argv, or None if help or an unknown command comes first."""
+    for arg in argv:
+        if arg in ('-h', '--help'):
+            return None
+        if not arg.startswith('-'):
+            return arg if arg in COMMANDS else None
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='GitFlowAI - GitHub workflow automation tool')
+    parser.add_argument('--json', action='store_true', help='Output result as JSON')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    # Only build the subparser that will run; build all of them for help and errors
+    command = find_command(sys.argv[1:])
+    for name, (_, add_parser) in COMMANDS.items():
+        if command is None or name == command:
+            add_parser(subparsers)
     
     args = parser.parse_args()
-    config = load_config()
+    progress.quiet = args.json
+    config = LazyConfig()
     token = get_token(config)
     
-    result = None
-    if args.command == 'create':
-        result = cmd_create(args, config, token)
-    elif args.command == 'push':
-        result = cmd_push(args, config, token)
-    elif args.command == 'commit':
-        result = cmd_commit(args, config, token)
-    elif args.command == 'branch':
-        result = cmd_branch(args, config, token)
-    elif args.command == 'pr':
-        result = cmd_pr(args, config, token)
+    handler, _ = COMMANDS[args.command]
+    result = handler(args, config, token)
     
     if args.json and result:
         print(json.dumps(result, indent=2))
-    elif not args.json:
-        print("\n✓ Done!")
+    progress.say("\n✓ Done!")
+    progress.flush()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,89 @@
+import argparse
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import gitflowapp
+
+gitflowapp.progress.quiet = True
+
+GIT_ENV = {
+    'GIT_AUTHOR_NAME': 'test', 'GIT_AUTHOR_EMAIL': 'test@example.com',
+    'GIT_COMMITTER_NAME': 'test', 'GIT_COMMITTER_EMAIL': 'test@example.com',
+}
+
+
+def git(repo, *args):
+    subprocess.run(['git', *args], cwd=repo, check=True, capture_output=True,
+                   env={**os.environ, **GIT_ENV})
+
+
+def write(repo, name, text, mode='w'):
+    path = os.path.join(repo, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, mode) as f:
+        f.write(text)
+
+
+def make_repo(tmp_path):
+    remote = str(tmp_path / 'remote.git')
+    repo = str(tmp_path / 'repo')
+    subprocess.run(['git', 'init', '-q', '--bare', remote], check=True)
+    os.mkdir(repo)
+    git(repo, 'init', '-q', '-b', 'main')
+    write(repo, 'a.txt', 'a\n')
+    write(repo, 'b.txt', 'b\n')
+    git(repo, 'add', '.')
+    git(repo, 'commit', '-q', '-m', 'first')
+    git(repo, 'remote', 'add', 'origin', remote)
+    git(repo, 'push', '-q', 'origin', 'main')
+    return repo
+
+
+def commit(repo, monkeypatch):
+    for key, value in GIT_ENV.items():
+        monkeypatch.setenv(key, value)
+    args = argparse.Namespace(path=repo, message='update', branch=None, json=True)
+    return gitflowapp.cmd_commit(args, {}, 'token')['status']
+
+
+def test_clean_worktree_has_no_changes(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path)
+    assert commit(repo, monkeypatch) == 'no_changes'
+
+
+def test_modified_tracked_file_in_ignored_dir_is_committed(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path)
+    write(repo, '.gitignore', 'build/\n')
+    write(repo, 'build/keep.txt', '1\n')
+    git(repo, 'add', '.gitignore')
+    git(repo, 'add', '-f', 'build/keep.txt')
+    git(repo, 'commit', '-q', '-m', 'keep')
+    write(repo, 'build/keep.txt', '2\n', 'a')
+    assert commit(repo, monkeypatch) == 'success'
+
+
+def test_staged_changes_after_soft_reset_are_committed(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path)
+    write(repo, 'a.txt', 'more\n', 'a')
+    git(repo, 'commit', '-q', '-am', 'second')
+    git(repo, 'reset', '-q', '--soft', 'HEAD~1')
+    assert commit(repo, monkeypatch) == 'success'
+
+
+def test_unstaged_edit_after_git_status_is_committed(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path)
+    write(repo, 'a.txt', 'more\n', 'a')
+    git(repo, 'status')  # Rewrites .git/index while refreshing it
+    assert commit(repo, monkeypatch) == 'success'
+
+
+def test_unstaged_edit_after_committing_another_file_is_committed(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path)
+    write(repo, 'a.txt', 'more\n', 'a')
+    write(repo, 'b.txt', 'more\n', 'a')
+    git(repo, 'add', 'b.txt')
+    git(repo, 'commit', '-q', '-m', 'b only')
+    assert commit(repo, monkeypatch) == 'success'
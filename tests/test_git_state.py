@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import gitflowapp
+
+
+def make_repo(tmp_path, monkeypatch, *config):
+    monkeypatch.setattr(gitflowapp, 'GLOBAL_GIT_CONFIGS', [])
+    repo = str(tmp_path)
+    subprocess.run(['git', 'init', '-q', '-b', 'main', repo], check=True)
+    for key, value in config:
+        subprocess.run(['git', 'config', key, value], cwd=repo, check=True)
+    return repo
+
+
+def test_plain_origin_is_read_from_files(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path, monkeypatch, ('remote.origin.url', 'git@github.com:o/r.git'))
+    assert gitflowapp.read_git_files(repo) == {'branch': 'main', 'origin_url': 'git@github.com:o/r.git'}
+
+
+def test_insteadof_origin_is_resolved_by_git(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path, monkeypatch, ('url.git@github.com:.insteadOf', 'gh:'),
+                     ('remote.origin.url', 'gh:o/r'))
+    assert gitflowapp.read_git_files(repo) is None
+    assert gitflowapp.query_git_state(repo) == {'branch': 'main', 'origin_url': 'git@github.com:o/r'}
+
+
+def test_missing_origin_falls_back_to_git(tmp_path, monkeypatch):
+    repo = make_repo(tmp_path, monkeypatch, ('include.path', 'extra.config'))
+    with open(os.path.join(repo, '.git', 'extra.config'), 'w') as f:
+        f.write('[remote "origin"]\n\turl = git@github.com:o/r.git\n')
+    assert gitflowapp.read_git_files(repo) is None
+    assert gitflowapp.query_git_state(repo)['origin_url'] == 'git@github.com:o/r.git'